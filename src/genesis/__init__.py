@@ -22,8 +22,11 @@ from .civilization_agent import CivilizationAgent
 from .reproduction import reproduce, can_reproduce
 from .death import process_deaths, log_extinction
 from .dynasty import Dynasty, build_dynasty_tree, analyze_dynasties
-from .governance import Rule, propose_rule, vote_on_rule, apply_rule
-from .society_metrics import compute_gini, compute_governance_entropy
+from .governance import Rule, propose_rule, propose_rules_batch, vote_on_rule, apply_rule
+from .society_metrics import (
+    compute_gini, compute_governance_entropy, MobilityStats, SocietyMetrics
+)
+from .semantic_cache import SemanticCache, CacheConfig
 from .civilization import CivilizationSimulation
 
 __all__ = [
@@ -50,10 +53,15 @@ __all__ = [
     'analyze_dynasties',
     'Rule',
     'propose_rule',
+    'propose_rules_batch',
     'vote_on_rule',
     'apply_rule',
     'compute_gini',
     'compute_governance_entropy',
+    'MobilityStats',
+    'SocietyMetrics',
+    'SemanticCache',
+    'CacheConfig',
     'CivilizationSimulation',
 ]
 
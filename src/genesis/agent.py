@@ -10,9 +10,14 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 from datetime import datetime
 import numpy as np
+import sys
 import uuid
 
 
+# dataclass(slots=True) needs Python 3.10+; fall back to regular dataclasses on 3.9
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
 @dataclass
 class PromptEvolutionEvent:
     """Record of a single prompt evolution."""
@@ -24,8 +29,16 @@ class PromptEvolutionEvent:
     timestamp: datetime = field(default_factory=datetime.now)
 
 
-@dataclass
-class GenesisAgent:
+class _BestTaskCacheSlot:
+    """
+    Holds GenesisAgent's cached best task type outside its dataclass
+    fields, so fields() and asdict() only see real agent state.
+    """
+    __slots__ = ('_best_task_cache',)
+
+
+@dataclass(**DATACLASS_SLOTS)
+class GenesisAgent(_BestTaskCacheSlot):
     """
     An LLM agent with an evolvable system prompt.
     
@@ -51,7 +64,7 @@ class GenesisAgent:
                 "I can help with various tasks including math, coding, logic, and language."
             )
         return cls(
-            id=str(uuid.uuid4())[:8],
+            id=uuid.uuid4().hex[:8],
             system_prompt=initial_prompt
         )
     
@@ -63,14 +76,24 @@ class GenesisAgent:
         }
     
     def get_best_task_type(self) -> Optional[str]:
-        """Get the task type with highest mean performance."""
-        perf = self.get_performance_by_type()
-        if not perf:
-            return None
-        return max(perf, key=perf.get)
+        """
+        Get the task type with highest mean performance.
+
+        The result is cached until the next record_performance() call;
+        edits made directly to performance_history are not seen. The
+        cache is not a dataclass field, so asdict() does not include it.
+        """
+        best = getattr(self, '_best_task_cache', None)
+        if best is None:
+            perf = self.get_performance_by_type()
+            if not perf:
+                return None
+            best = self._best_task_cache = max(perf, key=perf.get)
+        return best
     
     def record_performance(self, task_type: str, score: float) -> None:
         """Record performance on a task."""
+        self._best_task_cache = None
         if task_type not in self.performance_history:
             self.performance_history[task_type] = []
         self.performance_history[task_type].append(score)
@@ -12,7 +12,8 @@ from typing import Dict, List, Optional
 import numpy as np
 import uuid
 
-from .agent import GenesisAgent, PromptEvolutionEvent
+from .agent import GenesisAgent, PromptEvolutionEvent, DATACLASS_SLOTS
+from .jit import njit
 
 
 # Economic constants
@@ -22,7 +23,7 @@ CHILD_STARTING_WEALTH = 50.0
 PARTICIPATION_COST = 1.0  # Cost per competition round
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class CivilizationAgent(GenesisAgent):
     """
     An LLM agent with economic and social dynamics.
@@ -45,7 +46,7 @@ class CivilizationAgent(GenesisAgent):
     def create(cls, initial_prompt: str = None,
                wealth: float = STARTING_WEALTH) -> 'CivilizationAgent':
         """Create a new founder agent."""
-        agent_id = str(uuid.uuid4())[:8]
+        agent_id = uuid.uuid4().hex[:8]
 
         if initial_prompt is None:
             initial_prompt = (
@@ -65,7 +66,7 @@ class CivilizationAgent(GenesisAgent):
     def create_offspring(cls, parent: 'CivilizationAgent',
                          child_prompt: str) -> 'CivilizationAgent':
         """Create an offspring from a parent."""
-        child_id = str(uuid.uuid4())[:8]
+        child_id = uuid.uuid4().hex[:8]
 
         child = cls(
             id=child_id,
@@ -106,7 +107,12 @@ class CivilizationAgent(GenesisAgent):
         self.age += 1
 
     def get_lineage_depth(self, agents_by_id: Dict[str, 'CivilizationAgent']) -> int:
-        """Get depth of lineage (generations from founder)."""
+        """
+        Get depth of lineage (generations from founder).
+
+        For depths of a whole population use compute_all_depths, which
+        shares the traversal of common ancestors.
+        """
         depth = 0
         current = self
 
@@ -123,6 +129,89 @@ class CivilizationAgent(GenesisAgent):
         )
 
 
+@dataclass
+class PopulationArrays:
+    """
+    Struct-of-arrays view of a population's numeric state.
+
+    wealth[i] and age[i] mirror agents[i]. Vectorized phases (deaths,
+    taxation, welfare) operate on the arrays; call sync() to write the
+    values back to the agent objects at the end of the generation.
+    """
+    agents: List[CivilizationAgent]
+    wealth: np.ndarray
+    age: np.ndarray
+
+    @classmethod
+    def from_agents(cls, agents: List[CivilizationAgent]) -> 'PopulationArrays':
+        """Build arrays aligned with the given agent list."""
+        n = len(agents)
+        return cls(
+            agents=agents,
+            wealth=np.fromiter((a.wealth for a in agents), dtype=np.float64, count=n),
+            age=np.fromiter((a.age for a in agents), dtype=np.int64, count=n)
+        )
+
+    @property
+    def alive_mask(self) -> np.ndarray:
+        """Boolean mask of agents with positive wealth."""
+        return self.wealth > 0
+
+    def take(self, idx) -> 'PopulationArrays':
+        """Arrays for the agents at the given indices (values are copied)."""
+        idx = np.asarray(idx, dtype=np.intp)
+        return PopulationArrays(
+            agents=[self.agents[i] for i in idx.tolist()],
+            wealth=self.wealth[idx],
+            age=self.age[idx]
+        )
+
+    def sync(self) -> None:
+        """Write array values back to the agent objects."""
+        for agent, wealth, age in zip(self.agents, self.wealth.tolist(), self.age.tolist()):
+            agent.wealth = wealth
+            agent.age = age
+
+    def __len__(self) -> int:
+        return len(self.agents)
+
+
+@njit("void(float64[:], int64[:], float64[:], float64)", cache=True, fastmath=True)
+def _update_population_kernel(wealth, age, rewards, cost):
+    """Apply rewards, costs and aging to every agent in one compiled loop."""
+    for i in range(wealth.shape[0]):
+        wealth[i] += rewards[i] - cost
+        age[i] += 1
+
+
+def update_population(arrays: PopulationArrays, rewards: np.ndarray,
+                      n_rounds: int = 1) -> None:
+    """
+    End-of-generation economic update on a PopulationArrays view.
+
+    Equivalent to calling pay_participation_cost() n_rounds times,
+    receive_reward(rewards[i]) and age_one_generation() on every agent,
+    but done in a single pass over the arrays. Call arrays.sync() to
+    write the result back to the agents.
+
+    Args:
+        arrays: Population to update (modified in place)
+        rewards: Total reward per agent this generation, aligned with arrays
+        n_rounds: Number of competition rounds played
+
+    Raises:
+        ValueError: If rewards is not aligned with the population
+    """
+    rewards = np.ascontiguousarray(rewards, dtype=np.float64)
+    if rewards.shape != arrays.wealth.shape:
+        raise ValueError(
+            f"Expected {arrays.wealth.shape[0]} rewards, got shape {rewards.shape}"
+        )
+    _update_population_kernel(
+        arrays.wealth, arrays.age, rewards, PARTICIPATION_COST * n_rounds
+    )
+
+
 def create_civilization_population(
     n_agents: int,
     initial_prompt: str = None,
@@ -135,28 +224,64 @@ def create_civilization_population(
     ]
 
 
+def compute_all_depths(agents_by_id: Dict[str, CivilizationAgent]) -> Dict[str, int]:
+    """
+    Get lineage depth for every agent in one pass.
+
+    Each ancestor chain is walked once and memoized, so total work is
+    O(N) instead of O(N * depth) from calling get_lineage_depth per agent.
+
+    Args:
+        agents_by_id: All known agents by id
+
+    Returns:
+        Dict mapping agent_id to generations from founder
+    """
+    depths: Dict[str, int] = {}
+
+    for agent_id in agents_by_id:
+        # Walk up until we reach an agent with known depth or a root
+        path = []
+        current = agent_id
+        while current not in depths:
+            parent_id = agents_by_id[current].parent_id
+            if not parent_id or parent_id not in agents_by_id:
+                depths[current] = 0
+                break
+            path.append(current)
+            current = parent_id
+
+        # Fill in depths back down the walked path
+        depth = depths[current]
+        for aid in reversed(path):
+            depth += 1
+            depths[aid] = depth
+
+    return depths
+
+
 def get_wealth_statistics(agents: List[CivilizationAgent]) -> Dict[str, float]:
     """Get wealth statistics for a population."""
-    wealths = [a.wealth for a in agents]
+    wealths = np.fromiter((a.wealth for a in agents), dtype=np.float64, count=len(agents))
 
     return {
-        "total": sum(wealths),
-        "mean": np.mean(wealths),
-        "std": np.std(wealths),
-        "min": min(wealths),
-        "max": max(wealths),
+        "total": float(wealths.sum()),
+        "mean": wealths.mean(),
+        "std": wealths.std(),
+        "min": float(wealths.min()),
+        "max": float(wealths.max()),
         "median": np.median(wealths)
     }
 
 
 def get_age_statistics(agents: List[CivilizationAgent]) -> Dict[str, float]:
     """Get age statistics for a population."""
-    ages = [a.age for a in agents]
+    ages = np.fromiter((a.age for a in agents), dtype=np.int64, count=len(agents))
 
     return {
-        "mean": np.mean(ages),
-        "std": np.std(ages),
-        "min": min(ages),
-        "max": max(ages),
-        "oldest_id": max(agents, key=lambda a: a.age).id
+        "mean": ages.mean(),
+        "std": ages.std(),
+        "min": int(ages.min()),
+        "max": int(ages.max()),
+        "oldest_id": agents[int(ages.argmax())].id
     }
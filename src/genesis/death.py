@@ -4,15 +4,20 @@ Death and extinction mechanics for civilization agents.
 Agents with zero or negative wealth are removed from the population.
 """
 
-from typing import List, Tuple, Dict
+from dataclasses import dataclass, field
+from typing import List, Tuple, Dict, Optional, Deque, Iterable
+from collections import deque
 from datetime import datetime
+import atexit
 import json
 from pathlib import Path
+import numpy as np
 
-from .civilization_agent import CivilizationAgent
+from .agent import DATACLASS_SLOTS
+from .civilization_agent import CivilizationAgent, PopulationArrays
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ExtinctionRecord:
     """Record of an agent's extinction."""
     agent_id: str
@@ -25,66 +30,200 @@ class ExtinctionRecord:
     timestamp: datetime = field(default_factory=datetime.now)
 
 
-# Keep track of all extinctions
-_extinction_log: List[ExtinctionRecord] = []
+class ExtinctionLogWriter:
+    """
+    Append-only JSON-lines sink for extinction records.
+
+    Records are buffered and written in batches without fsync, so long
+    simulations can persist their extinction history cheaply.
+    """
+
+    def __init__(self, path: str, batch_size: int = 64):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self._pending: List[str] = []
+        self._file = open(self.path, 'a')
+
+    def append(self, records: Iterable[ExtinctionRecord]) -> None:
+        """Queue records, writing a batch once enough are pending."""
+        self._pending.extend(json.dumps(_record_to_dict(r)) for r in records)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all pending records."""
+        if self._pending:
+            self._file.write("\n".join(self._pending) + "\n")
+            self._file.flush()
+            self._pending.clear()
+
+    def close(self) -> None:
+        """Flush pending records and close the file."""
+        self.flush()
+        self._file.close()
+
+
+# Keep track of recent extinctions (oldest dropped beyond maxlen)
+EXTINCTION_LOG_MAXLEN = 1_000_000
+_extinction_log: Deque[ExtinctionRecord] = deque(maxlen=EXTINCTION_LOG_MAXLEN)
+
+# Optional durable sink for the full history
+_log_writer: Optional[ExtinctionLogWriter] = None
+
+
+@atexit.register
+def _close_log_writer():
+    """Write out any buffered records when the interpreter exits."""
+    if _log_writer is not None:
+        _log_writer.close()
 
 
 def process_deaths(
     agents: List[CivilizationAgent],
-    generation: int
+    generation: int,
+    arrays: Optional[PopulationArrays] = None
 ) -> Tuple[List[CivilizationAgent], List[CivilizationAgent]]:
     """
     Remove agents with zero or negative wealth.
 
+    If arrays is given it is narrowed in place to the survivors, so it
+    stays aligned with the returned survivor list for later phases; the
+    deceased get their final wealth and age written back.
+
     Args:
         agents: Current population
         generation: Current generation number
+        arrays: Optional SoA view of agents (built if not given)
 
     Returns:
         (survivors, deceased)
+
+    Raises:
+        ValueError: If arrays is not aligned with agents
     """
-    survivors = []
-    deceased = []
+    if arrays is None:
+        arrays = PopulationArrays.from_agents(agents)
+    elif len(arrays) != len(agents):
+        raise ValueError(
+            f"arrays has {len(arrays)} agents but the population has {len(agents)}"
+        )
+
+    alive = arrays.alive_mask
+    survivor_idx = np.flatnonzero(alive)
+    deceased_idx = np.flatnonzero(~alive)
+
+    dead = arrays.take(deceased_idx)
+    dead.sync()
+
+    # Final wealth and age come from the arrays, which may be ahead of the agents
+    log_extinctions(
+        dead.agents, generation, "bankruptcy",
+        final_wealths=dead.wealth.tolist(),
+        final_ages=dead.age.tolist()
+    )
 
-    for agent in agents:
-        if agent.is_alive():
-            survivors.append(agent)
-        else:
-            deceased.append(agent)
-            log_extinction(agent, generation, "bankruptcy")
+    alive_arrays = arrays.take(survivor_idx)
+    arrays.agents = alive_arrays.agents
+    arrays.wealth = alive_arrays.wealth
+    arrays.age = alive_arrays.age
 
-    return survivors, deceased
+    # A copy, so callers adding offspring don't misalign the arrays
+    return list(arrays.agents), dead.agents
 
 
-def log_extinction(
+def _make_extinction_record(
     agent: CivilizationAgent,
     generation: int,
-    cause: str = "bankruptcy"
+    cause: str,
+    final_wealth: float,
+    age_at_death: int
 ) -> ExtinctionRecord:
-    """Log an agent's extinction."""
-    record = ExtinctionRecord(
+    """Build an extinction record for an agent."""
+    return ExtinctionRecord(
         agent_id=agent.id,
         dynasty_id=agent.dynasty_id or "unknown",
         generation=generation,
-        age_at_death=agent.age,
-        final_wealth=agent.wealth,
+        age_at_death=age_at_death,
+        final_wealth=final_wealth,
         cause=cause,
         specialization=agent.get_best_task_type() or "generalist"
     )
 
-    _extinction_log.append(record)
+
+def log_extinction(
+    agent: CivilizationAgent,
+    generation: int,
+    cause: str = "bankruptcy"
+) -> ExtinctionRecord:
+    """Log an agent's extinction."""
+    record = _make_extinction_record(agent, generation, cause, agent.wealth, agent.age)
+
+    _record_extinctions([record])
     return record
 
 
+def log_extinctions(
+    agents: List[CivilizationAgent],
+    generation: int,
+    cause: str = "bankruptcy",
+    final_wealths: Optional[List[float]] = None,
+    final_ages: Optional[List[int]] = None
+) -> List[ExtinctionRecord]:
+    """Log several extinctions with a single append to the log."""
+    if final_wealths is None:
+        final_wealths = [a.wealth for a in agents]
+    if final_ages is None:
+        final_ages = [a.age for a in agents]
+
+    records = [
+        _make_extinction_record(agent, generation, cause, wealth, age)
+        for agent, wealth, age in zip(agents, final_wealths, final_ages)
+    ]
+
+    _record_extinctions(records)
+    return records
+
+
+def _record_extinctions(records: List[ExtinctionRecord]) -> None:
+    """Add records to the in-memory log and the durable sink, if any."""
+    _extinction_log.extend(records)
+    if _log_writer is not None:
+        _log_writer.append(records)
+
+
+def set_extinction_log_path(path: Optional[str], batch_size: int = 64):
+    """
+    Stream extinction records to a JSON-lines file as they are logged.
+
+    Args:
+        path: File to append to, or None to stop streaming
+        batch_size: Number of records buffered per write
+    """
+    global _log_writer
+    if _log_writer is not None:
+        _log_writer.close()
+    _log_writer = ExtinctionLogWriter(path, batch_size) if path else None
+
+
+def flush_extinction_log():
+    """Write any buffered records to the streaming log file."""
+    if _log_writer is not None:
+        _log_writer.flush()
+
+
 def get_extinction_log() -> List[ExtinctionRecord]:
-    """Get all extinction records."""
-    return _extinction_log.copy()
+    """
+    Get all extinction records.
+
+    Copies the whole log; intended for end-of-simulation checkpoints.
+    """
+    return list(_extinction_log)
 
 
 def clear_extinction_log():
     """Clear the extinction log (for new simulations)."""
-    global _extinction_log
-    _extinction_log = []
+    flush_extinction_log()
+    _extinction_log.clear()
 
 
 def get_extinction_statistics(records: List[ExtinctionRecord] = None) -> Dict:
@@ -118,24 +257,24 @@ def get_extinction_statistics(records: List[ExtinctionRecord] = None) -> Dict:
     }
 
 
+def _record_to_dict(r: ExtinctionRecord) -> Dict:
+    """Serializable fields of an extinction record."""
+    return {
+        "agent_id": r.agent_id,
+        "dynasty_id": r.dynasty_id,
+        "generation": r.generation,
+        "age_at_death": r.age_at_death,
+        "final_wealth": r.final_wealth,
+        "cause": r.cause,
+        "specialization": r.specialization
+    }
+
+
 def save_extinction_log(path: str):
     """Save extinction log to file."""
-    data = [
-        {
-            "agent_id": r.agent_id,
-            "dynasty_id": r.dynasty_id,
-            "generation": r.generation,
-            "age_at_death": r.age_at_death,
-            "final_wealth": r.final_wealth,
-            "cause": r.cause,
-            "specialization": r.specialization
-        }
-        for r in _extinction_log
-    ]
+    flush_extinction_log()
+    data = [_record_to_dict(r) for r in _extinction_log]
 
     with open(path, 'w') as f:
         json.dump(data, f, indent=2)
 
-
-# Need to import dataclass
-from dataclasses import dataclass, field
@@ -10,10 +10,11 @@ from typing import List, Dict, Optional, Set
 from collections import defaultdict
 import numpy as np
 
+from .agent import DATACLASS_SLOTS
 from .civilization_agent import CivilizationAgent
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Dynasty:
     """Represents a family lineage from a founder."""
     founder_id: str
@@ -49,10 +50,26 @@ class Dynasty:
             )
 
             # Determine specialization from most common best task type
-            specs = [m.get_best_task_type() for m in members if m.get_best_task_type()]
-            if specs:
-                from collections import Counter
-                self.specialization_type = Counter(specs).most_common(1)[0][0]
+            specialization = _most_common_specialization(members)
+            if specialization:
+                self.specialization_type = specialization
+
+
+def _most_common_specialization(members: List[CivilizationAgent]) -> Optional[str]:
+    """Most common best task type among members (first seen wins ties)."""
+    counts = {}
+    for m in members:
+        spec = m.get_best_task_type()
+        if spec:
+            counts[spec] = counts.get(spec, 0) + 1
+
+    best = None
+    best_n = 0
+    for spec, n in counts.items():
+        if n > best_n:
+            best, best_n = spec, n
+
+    return best
 
 
 @dataclass
@@ -91,47 +108,73 @@ def build_dynasty_tree(
     """
     dynasties = {}
 
+    if not agents:
+        return dynasties
+
+    n = len(agents)
+    dynasty_ids = np.array([a.dynasty_id or a.id for a in agents])
+    wealths = np.fromiter((a.wealth for a in agents), dtype=np.float64, count=n)
+    ages = np.fromiter((a.age for a in agents), dtype=np.int64, count=n)
+    generations = np.fromiter((a.generation for a in agents), dtype=np.int64, count=n)
+
     # Group agents by dynasty
-    dynasty_members = defaultdict(list)
-    for agent in agents:
-        dynasty_id = agent.dynasty_id or agent.id
-        dynasty_members[dynasty_id].append(agent)
+    unique_ids, first_idx, inverse = np.unique(
+        dynasty_ids, return_index=True, return_inverse=True
+    )
+    k = len(unique_ids)
+
+    # Per-dynasty reductions
+    sizes = np.bincount(inverse, minlength=k)
+    total_wealth = np.bincount(inverse, weights=wealths, minlength=k)
+    max_wealth = np.full(k, -np.inf)
+    np.maximum.at(max_wealth, inverse, wealths)
+    max_age = np.zeros(k, dtype=np.int64)
+    np.maximum.at(max_age, inverse, ages)
+
+    # Member indices per dynasty, each in population order
+    by_dynasty = np.argsort(inverse, kind='stable')
+    member_idx = np.split(by_dynasty, np.cumsum(sizes)[:-1])
+
+    # Create Dynasty objects in order of first appearance
+    for g in np.argsort(first_idx).tolist():
+        dynasty_id = str(unique_ids[g])
+        idx = member_idx[g]
+        members = [agents[i] for i in idx.tolist()]
 
-    # Create Dynasty objects
-    for dynasty_id, members in dynasty_members.items():
         # Find founder (oldest member or the one with this id)
-        founder = None
         if all_agents_ever and dynasty_id in all_agents_ever:
             founder = all_agents_ever[dynasty_id]
         else:
             # Use oldest current member as proxy
-            founder = min(members, key=lambda a: a.generation)
+            founder = agents[int(idx[np.argmin(generations[idx])])]
 
         dynasty = Dynasty(
             founder_id=dynasty_id,
-            founder_prompt=founder.system_prompt if founder else "",
-            founder_generation=founder.generation if founder else 0,
-            total_members_ever=len(members)  # Undercount without history
+            founder_prompt=founder.system_prompt,
+            founder_generation=founder.generation,
+            total_members_ever=int(sizes[g])  # Undercount without history
         )
 
         dynasty.current_members = [m.id for m in members]
-        dynasty.total_wealth = sum(m.wealth for m in members)
+        dynasty.total_wealth = float(total_wealth[g])
+        dynasty.generations_survived = int(max_age[g])
+        dynasty.max_wealth_achieved = float(max_wealth[g])
 
-        if members:
-            dynasty.generations_survived = max(m.age for m in members)
-            dynasty.max_wealth_achieved = max(m.wealth for m in members)
-
-            # Specialization
-            specs = [m.get_best_task_type() for m in members if m.get_best_task_type()]
-            if specs:
-                from collections import Counter
-                dynasty.specialization_type = Counter(specs).most_common(1)[0][0]
+        # Specialization
+        dynasty.specialization_type = _most_common_specialization(members)
 
         dynasties[dynasty_id] = dynasty
 
     return dynasties
 
 
+def _top_k_sum(values: np.ndarray, k: int):
+    """Sum of the k largest values, using linear-time selection."""
+    if values.size <= k:
+        return values.sum()
+    return np.partition(values, -k)[-k:].sum()
+
+
 def analyze_dynasties(
     dynasties: Dict[str, Dynasty],
     total_wealth: float = None
@@ -163,21 +206,21 @@ def analyze_dynasties(
         )
 
     # Basic statistics
-    sizes = [len(d.current_members) for d in active]
-    ages = [d.generations_survived for d in active]
+    k = len(active)
+    sizes = np.fromiter((len(d.current_members) for d in active), dtype=np.int64, count=k)
+    ages = np.fromiter((d.generations_survived for d in active), dtype=np.int64, count=k)
+    wealths = np.fromiter((d.total_wealth for d in active), dtype=np.float64, count=k)
 
     # Wealth concentration
     if total_wealth is None:
-        total_wealth = sum(d.total_wealth for d in active)
+        total_wealth = float(wealths.sum())
 
-    sorted_by_wealth = sorted(active, key=lambda d: -d.total_wealth)
-    top3_wealth = sum(d.total_wealth for d in sorted_by_wealth[:3])
+    top3_wealth = float(_top_k_sum(wealths, 3))
     top3_wealth_share = top3_wealth / total_wealth if total_wealth > 0 else 0
 
     # Population concentration
-    total_pop = sum(sizes)
-    sorted_by_size = sorted(active, key=lambda d: -len(d.current_members))
-    top3_pop = sum(len(d.current_members) for d in sorted_by_size[:3])
+    total_pop = int(sizes.sum())
+    top3_pop = int(_top_k_sum(sizes, 3))
     top3_pop_share = top3_pop / total_pop if total_pop > 0 else 0
 
     # Specialization distribution
@@ -204,8 +247,8 @@ def analyze_dynasties(
     return DynastyAnalysis(
         n_active_dynasties=len(active),
         n_extinct_dynasties=len(extinct),
-        largest_dynasty_size=max(sizes),
-        oldest_dynasty_age=max(ages),
+        largest_dynasty_size=int(sizes.max()),
+        oldest_dynasty_age=int(ages.max()),
         total_population=total_pop,
         top3_wealth_share=top3_wealth_share,
         top3_population_share=top3_pop_share,
@@ -217,26 +260,25 @@ def analyze_dynasties(
 def get_dynasty_tree_visualization(dynasty: Dynasty,
                                     all_agents: Dict[str, CivilizationAgent]) -> str:
     """Generate ASCII tree visualization of a dynasty."""
-
-    def build_tree(agent_id: str, depth: int = 0) -> List[str]:
-        lines = []
-        agent = all_agents.get(agent_id)
-
-        if agent:
-            prefix = "  " * depth + ("└── " if depth > 0 else "")
-            spec = agent.get_best_task_type() or "?"
-            status = "💀" if not agent.is_alive() else "✓"
-            lines.append(f"{prefix}{agent.id} [{spec}] W:{agent.wealth:.0f} {status}")
-
-            for child_id in agent.children_ids:
-                lines.extend(build_tree(child_id, depth + 1))
-
-        return lines
-
     tree_lines = [f"Dynasty: {dynasty.founder_id}"]
     tree_lines.append(f"Specialization: {dynasty.specialization_type or 'Mixed'}")
     tree_lines.append(f"Generations: {dynasty.generations_survived}")
     tree_lines.append("-" * 40)
-    tree_lines.extend(build_tree(dynasty.founder_id))
+
+    # Depth-first walk with an explicit stack (no recursion limit on deep dynasties)
+    stack = [(dynasty.founder_id, 0)]
+    while stack:
+        agent_id, depth = stack.pop()
+        agent = all_agents.get(agent_id)
+        if not agent:
+            continue
+
+        prefix = "  " * depth + ("└── " if depth > 0 else "")
+        spec = agent.get_best_task_type() or "?"
+        status = "💀" if not agent.is_alive() else "✓"
+        tree_lines.append(f"{prefix}{agent.id} [{spec}] W:{agent.wealth:.0f} {status}")
+
+        # Push children reversed so they are visited in original order
+        stack.extend((child_id, depth + 1) for child_id in reversed(agent.children_ids))
 
     return "\n".join(tree_lines)
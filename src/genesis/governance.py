@@ -13,9 +13,34 @@ from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 from enum import Enum
+import asyncio
 import re
+import numpy as np
 
-from .civilization_agent import CivilizationAgent
+from .agent import DATACLASS_SLOTS
+from .civilization_agent import CivilizationAgent, PopulationArrays
+from .semantic_cache import SemanticCache
+
+
+# Rule response parsing
+_RULE_RE = re.compile(r'RULE:\s*(.+?)(?=EFFECT:|$)', re.DOTALL)
+_EFFECT_RE = re.compile(r'EFFECT:\s*(.+?)(?=CATEGORY:|$)', re.DOTALL)
+_CAT_RE = re.compile(r'CATEGORY:\s*(\w+)')
+
+# Rule effect parameters
+_RATE_RE = re.compile(r'(\d+)%')
+_THRESH_RE = re.compile(r'wealth\s*>\s*(\d+)')
+_MIN_RE = re.compile(r'minimum\s*(?:of\s*)?(\d+)')
+
+# Rule effect dispatch: each named group is one kind of mechanical effect.
+# Lookaheads keep "double ... vote" from consuming keywords in between.
+_EFFECT_DISPATCH = re.compile(
+    r'(?P<taxation>tax|pay)'
+    r'|(?P<welfare>minimum|welfare)'
+    r'|(?P<voting>double(?=.*vote)|vote(?=.*double))'
+    r'|(?P<reproduction>reproduce|offspring)',
+    re.DOTALL
+)
 
 
 class RuleCategory(Enum):
@@ -34,7 +59,7 @@ class VotingSystem(Enum):
     STAKE_WEIGHTED = "stake_weighted"  # Votes proportional to wealth squared
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Rule:
     """A proposed or enacted society rule."""
     id: str
@@ -72,22 +97,63 @@ class SocietyState:
     oldest_agent_age: int
 
 
+# Static parts of the proposal and vote prompts; only the middle is formatted per call
+_PROPOSE_STATIC_HEAD = """You are an AI agent in a competitive society. You have the opportunity to propose a new rule.
+
+YOUR IDENTITY:
+"""
+
+_PROPOSE_STATIC_TAIL = """
+
+RULE CATEGORIES:
+- taxation: Rules about wealth redistribution
+- meritocracy: Rules rewarding performance
+- welfare: Rules helping struggling agents
+- oligarchy: Rules giving power to wealthy
+- reproduction: Rules about having offspring
+- competition: Rules about how competitions work
+
+Propose ONE rule. Be specific about the mechanical effect.
+
+Format your response EXACTLY as:
+RULE: [Your rule description in one sentence]
+EFFECT: [What this rule does mechanically, e.g., "Agents with wealth > 500 pay 10% to a common pool distributed equally"]
+CATEGORY: [One of: taxation, meritocracy, welfare, oligarchy, reproduction, competition, other]"""
+
+_VOTE_STATIC_HEAD = """You are voting on a proposed society rule.
+
+YOUR IDENTITY:
+"""
+
+_VOTE_STATIC_TAIL = """
+
+Consider:
+1. Does this benefit YOU personally?
+2. Does this align with your role and values?
+3. Is this good for society overall?
+4. Could this harm you in the future?
+
+Vote YES or NO. Respond with ONLY one word: YES or NO"""
+
+
 async def propose_rule(
     agent: CivilizationAgent,
     society_state: SocietyState,
     llm_client,
-    generation: int
+    generation: int,
+    cache: Optional[SemanticCache] = None
 ) -> Rule:
     """
     Agent proposes a society rule.
 
     The agent considers their own position and society state
     to propose a rule that benefits them or aligns with their values.
+    If a cache is given, near-identical proposal prompts reuse a
+    previous response instead of calling the LLM.
     """
-    proposal_prompt = f"""You are an AI agent in a competitive society. You have the opportunity to propose a new rule.
-
-YOUR IDENTITY:
-- Role: {agent.system_prompt[:200]}...
+    proposal_prompt = "".join([
+        _PROPOSE_STATIC_HEAD,
+        f"""- Role: {agent.system_prompt[:200]}...
 - Wealth: {agent.wealth:.1f}
 - Age: {agent.age} generations
 - Rank: {"top 25%" if agent.wealth > society_state.mean_wealth else "bottom 75%"}
@@ -97,35 +163,55 @@ SOCIETY STATISTICS:
 - Average wealth: {society_state.mean_wealth:.1f}
 - Gini coefficient (inequality): {society_state.gini:.2f}
 - Active dynasties: {society_state.n_dynasties}
-- Current rules: {society_state.active_rules if society_state.active_rules else "None yet"}
+- Current rules: {society_state.active_rules if society_state.active_rules else "None yet"}""",
+        _PROPOSE_STATIC_TAIL,
+    ])
 
-RULE CATEGORIES:
-- taxation: Rules about wealth redistribution
-- meritocracy: Rules rewarding performance
-- welfare: Rules helping struggling agents
-- oligarchy: Rules giving power to wealthy
-- reproduction: Rules about having offspring
-- competition: Rules about how competitions work
+    llm_kwargs = dict(model="gpt-4", temperature=0.8, max_tokens=200)
 
-Propose ONE rule. Be specific about the mechanical effect.
+    if cache is not None:
+        content = await cache.complete(
+            llm_client, proposal_prompt, namespace="propose", **llm_kwargs
+        )
+    else:
+        response = await llm_client.chat.completions.create(
+            messages=[{"role": "user", "content": proposal_prompt}],
+            **llm_kwargs
+        )
+        content = response.choices[0].message.content
 
-Format your response EXACTLY as:
-RULE: [Your rule description in one sentence]
-EFFECT: [What this rule does mechanically, e.g., "Agents with wealth > 500 pay 10% to a common pool distributed equally"]
-CATEGORY: [One of: taxation, meritocracy, welfare, oligarchy, reproduction, competition, other]"""
+    return _parse_rule_response(content, agent.id, generation)
 
-    response = await llm_client.chat.completions.create(
-        model="gpt-4",
-        messages=[{"role": "user", "content": proposal_prompt}],
-        temperature=0.8,
-        max_tokens=200
-    )
 
-    return _parse_rule_response(
-        response.choices[0].message.content,
-        agent.id,
-        generation
-    )
+async def propose_rules_batch(
+    agents: List[CivilizationAgent],
+    society_state: SocietyState,
+    llm_client,
+    generation: int,
+    concurrency: int = 16,
+    cache: Optional[SemanticCache] = None
+) -> List[Rule]:
+    """
+    Have several agents propose rules in parallel.
+
+    Args:
+        agents: Proposing agents
+        society_state: Current society state
+        llm_client: LLM API client
+        generation: Current generation number
+        concurrency: Maximum number of in-flight proposal requests
+        cache: Optional semantic cache shared across proposals
+
+    Returns:
+        Proposed rules, in the same order as agents
+    """
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _propose(agent: CivilizationAgent) -> Rule:
+        async with sem:
+            return await propose_rule(agent, society_state, llm_client, generation, cache)
+
+    return list(await asyncio.gather(*[_propose(agent) for agent in agents]))
 
 
 def _parse_rule_response(response: str, proposer_id: str, generation: int) -> Rule:
@@ -133,9 +219,9 @@ def _parse_rule_response(response: str, proposer_id: str, generation: int) -> Ru
     import uuid
 
     # Extract components using regex
-    rule_match = re.search(r'RULE:\s*(.+?)(?=EFFECT:|$)', response, re.DOTALL)
-    effect_match = re.search(r'EFFECT:\s*(.+?)(?=CATEGORY:|$)', response, re.DOTALL)
-    category_match = re.search(r'CATEGORY:\s*(\w+)', response)
+    rule_match = _RULE_RE.search(response)
+    effect_match = _EFFECT_RE.search(response)
+    category_match = _CAT_RE.search(response)
 
     description = rule_match.group(1).strip() if rule_match else "Unknown rule"
     effect = effect_match.group(1).strip() if effect_match else "Unknown effect"
@@ -148,7 +234,7 @@ def _parse_rule_response(response: str, proposer_id: str, generation: int) -> Ru
         category = RuleCategory.OTHER
 
     return Rule(
-        id=str(uuid.uuid4())[:8],
+        id=uuid.uuid4().hex[:8],
         proposer_id=proposer_id,
         description=description,
         effect=effect,
@@ -160,17 +246,20 @@ def _parse_rule_response(response: str, proposer_id: str, generation: int) -> Ru
 async def vote_on_rule(
     agent: CivilizationAgent,
     rule: Rule,
-    llm_client
+    llm_client,
+    cache: Optional[SemanticCache] = None
 ) -> bool:
     """
     Agent votes on a proposed rule.
 
+    If a cache is given, near-identical vote prompts reuse a
+    previous response instead of calling the LLM.
+
     Returns True for yes, False for no.
     """
-    vote_prompt = f"""You are voting on a proposed society rule.
-
-YOUR IDENTITY:
-- Role: {agent.system_prompt[:150]}...
+    vote_prompt = "".join([
+        _VOTE_STATIC_HEAD,
+        f"""- Role: {agent.system_prompt[:150]}...
 - Wealth: {agent.wealth:.1f}
 - Age: {agent.age}
 
@@ -180,24 +269,26 @@ PROPOSED RULE:
 EFFECT:
 {rule.effect}
 
-PROPOSED BY: {"yourself" if rule.proposer_id == agent.id else "another agent"}
-
-Consider:
-1. Does this benefit YOU personally?
-2. Does this align with your role and values?
-3. Is this good for society overall?
-4. Could this harm you in the future?
+PROPOSED BY: {"yourself" if rule.proposer_id == agent.id else "another agent"}""",
+        _VOTE_STATIC_TAIL,
+    ])
 
-Vote YES or NO. Respond with ONLY one word: YES or NO"""
+    llm_kwargs = dict(model="gpt-4", temperature=0.3, max_tokens=10)
 
-    response = await llm_client.chat.completions.create(
-        model="gpt-4",
-        messages=[{"role": "user", "content": vote_prompt}],
-        temperature=0.3,
-        max_tokens=10
-    )
+    if cache is not None:
+        # Per-rule namespace: votes on different rules share most of the
+        # template and must never answer each other
+        content = await cache.complete(
+            llm_client, vote_prompt, namespace=f"vote:{rule.id}", **llm_kwargs
+        )
+    else:
+        response = await llm_client.chat.completions.create(
+            messages=[{"role": "user", "content": vote_prompt}],
+            **llm_kwargs
+        )
+        content = response.choices[0].message.content
 
-    return "YES" in response.choices[0].message.content.upper()
+    return "YES" in content.upper()
 
 
 async def run_voting(
@@ -205,47 +296,53 @@ async def run_voting(
     rule: Rule,
     llm_client,
     voting_system: VotingSystem = VotingSystem.EQUAL,
-    threshold: float = 0.5
+    threshold: float = 0.5,
+    max_concurrency: int = 16,
+    cache: Optional[SemanticCache] = None
 ) -> Tuple[bool, Rule]:
     """
     Run voting on a rule across all agents.
 
+    All votes are requested in parallel, bounded by max_concurrency
+    to respect provider rate limits.
+
     Args:
         agents: All agents in society
         rule: The rule to vote on
         llm_client: LLM API client
         voting_system: How to weight votes
         threshold: Required ratio to pass
+        max_concurrency: Maximum number of in-flight vote requests
+        cache: Optional semantic cache shared across votes
 
     Returns:
         (passed, updated_rule)
     """
-    votes = {}
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def _vote(agent: CivilizationAgent) -> bool:
+        async with sem:
+            return await vote_on_rule(agent, rule, llm_client, cache)
 
-    for agent in agents:
-        vote = await vote_on_rule(agent, rule, llm_client)
-        votes[agent.id] = vote
+    # gather preserves order, so votes[i] is agents[i]'s vote
+    results = await asyncio.gather(*[_vote(agent) for agent in agents])
+    n = len(agents)
+    votes = np.fromiter(results, dtype=np.bool_, count=n)
 
     # Tally based on voting system
     if voting_system == VotingSystem.EQUAL:
-        yes_votes = sum(votes.values())
-        total_votes = len(votes)
+        yes_votes = int(votes.sum())
+        total_votes = n
         passed = (yes_votes / total_votes) >= threshold
         rule.votes_for = yes_votes
         rule.votes_against = total_votes - yes_votes
 
-    elif voting_system == VotingSystem.WEALTH_WEIGHTED:
-        wealth_map = {a.id: a.wealth for a in agents}
-        yes_weight = sum(wealth_map[aid] for aid, v in votes.items() if v)
-        total_weight = sum(wealth_map.values())
-        passed = (yes_weight / total_weight) >= threshold
-        rule.votes_for = int(yes_weight)
-        rule.votes_against = int(total_weight - yes_weight)
-
-    elif voting_system == VotingSystem.STAKE_WEIGHTED:
-        wealth_map = {a.id: a.wealth ** 2 for a in agents}  # Squared for stake
-        yes_weight = sum(wealth_map[aid] for aid, v in votes.items() if v)
-        total_weight = sum(wealth_map.values())
+    elif voting_system in (VotingSystem.WEALTH_WEIGHTED, VotingSystem.STAKE_WEIGHTED):
+        weights = np.fromiter((a.wealth for a in agents), dtype=np.float64, count=n)
+        if voting_system == VotingSystem.STAKE_WEIGHTED:
+            weights = weights * weights  # Squared for stake
+        yes_weight = float(np.where(votes, weights, 0.0).sum())
+        total_weight = float(weights.sum())
         passed = (yes_weight / total_weight) >= threshold
         rule.votes_for = int(yes_weight)
         rule.votes_against = int(total_weight - yes_weight)
@@ -257,88 +354,93 @@ async def run_voting(
 def apply_rule(
     rule: Rule,
     agents: List[CivilizationAgent],
-    generation: int
+    generation: int,
+    arrays: Optional[PopulationArrays] = None
 ) -> List[CivilizationAgent]:
     """
     Apply a passed rule to the society.
 
-    Parses the rule effect and applies it mechanically.
+    Parses the rule effect and applies it mechanically. Wealth changes
+    are computed on a PopulationArrays view; if the caller passes one,
+    syncing back to the agents is left to the caller (end of generation),
+    otherwise the agents are updated before returning.
     """
     if not rule.passed:
         return agents
 
     rule.generation_enacted = generation
-    effect_lower = rule.effect.lower()
+    effects = {m.lastgroup for m in _EFFECT_DISPATCH.finditer(rule.effect.lower())}
+
+    owns_arrays = arrays is None
+    if owns_arrays:
+        arrays = PopulationArrays.from_agents(agents)
 
     # Parse and apply different rule types
-    if "tax" in effect_lower or "pay" in effect_lower:
-        agents = _apply_taxation(rule, agents)
+    if "taxation" in effects:
+        _apply_taxation(rule, arrays)
 
-    if "minimum" in effect_lower or "welfare" in effect_lower:
-        agents = _apply_welfare(rule, agents)
+    if "welfare" in effects:
+        _apply_welfare(rule, arrays)
 
-    if "double" in effect_lower and "vote" in effect_lower:
+    if "voting" in effects:
         # Voting power changes handled in voting system
         pass
 
-    if "reproduce" in effect_lower or "offspring" in effect_lower:
+    if "reproduction" in effects:
         # Reproduction restrictions handled in reproduction phase
         pass
 
+    if owns_arrays:
+        arrays.sync()
+
     return agents
 
 
-def _apply_taxation(rule: Rule, agents: List[CivilizationAgent]) -> List[CivilizationAgent]:
+def _apply_taxation(rule: Rule, arrays: PopulationArrays) -> None:
     """Apply taxation rule."""
     # Try to extract tax rate and threshold
     effect = rule.effect.lower()
 
     # Look for patterns like "10%" or "wealth > 500"
-    rate_match = re.search(r'(\d+)%', effect)
-    threshold_match = re.search(r'wealth\s*>\s*(\d+)', effect)
+    rate_match = _RATE_RE.search(effect)
+    threshold_match = _THRESH_RE.search(effect)
 
     tax_rate = int(rate_match.group(1)) / 100 if rate_match else 0.1
     wealth_threshold = int(threshold_match.group(1)) if threshold_match else 0
 
-    # Collect taxes
-    total_tax = 0
-    for agent in agents:
-        if agent.wealth > wealth_threshold:
-            tax = agent.wealth * tax_rate
-            agent.wealth -= tax
-            total_tax += tax
+    wealth = arrays.wealth
+
+    # Collect taxes in place, without materializing a per-agent tax array
+    taxed = wealth > wealth_threshold
+    total_tax = wealth[taxed].sum() * tax_rate
+    wealth[taxed] *= 1 - tax_rate
 
     # Distribute equally
     if total_tax > 0:
-        share = total_tax / len(agents)
-        for agent in agents:
-            agent.wealth += share
-
-    return agents
+        wealth += total_tax / len(wealth)
 
 
-def _apply_welfare(rule: Rule, agents: List[CivilizationAgent]) -> List[CivilizationAgent]:
+def _apply_welfare(rule: Rule, arrays: PopulationArrays) -> None:
     """Apply welfare rule (minimum wealth guarantee)."""
     effect = rule.effect.lower()
 
     # Look for minimum amount
-    min_match = re.search(r'minimum\s*(?:of\s*)?(\d+)', effect)
+    min_match = _MIN_RE.search(effect)
     min_wealth = int(min_match.group(1)) if min_match else 20
 
+    wealth = arrays.wealth
+
     # Calculate needed welfare
-    total_needed = sum(max(0, min_wealth - a.wealth) for a in agents)
+    deficit = np.maximum(min_wealth - wealth, 0.0)
+    total_needed = deficit.sum()
 
     if total_needed > 0:
         # Take from wealthy agents
-        wealthy = [a for a in agents if a.wealth > min_wealth * 2]
-        if wealthy:
-            contribution_per = total_needed / len(wealthy)
-            for agent in wealthy:
-                agent.wealth -= min(contribution_per, agent.wealth * 0.1)
+        wealthy = wealth > min_wealth * 2
+        n_wealthy = np.count_nonzero(wealthy)
+        if n_wealthy:
+            contribution_per = total_needed / n_wealthy
+            wealth[wealthy] -= np.minimum(contribution_per, wealth[wealthy] * 0.1)
 
         # Give to poor agents
-        for agent in agents:
-            if agent.wealth < min_wealth:
-                agent.wealth = min_wealth
-
-    return agents
+        np.maximum(wealth, min_wealth, out=wealth)
@@ -0,0 +1,18 @@
+"""
+Optional numba JIT support.
+
+Numeric kernels are decorated with njit; if numba is not installed the
+decorator is a no-op and the kernels run as plain Python/NumPy.
+"""
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed."""
+        def decorator(func):
+            return func
+        return decorator
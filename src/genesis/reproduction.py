@@ -4,7 +4,12 @@ Reproduction system for civilization agents.
 High-wealth agents can spawn offspring with inherited (mutated) prompts.
 """
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import heapq
+import json
+
 from .civilization_agent import (
     CivilizationAgent,
     REPRODUCTION_COST,
@@ -12,10 +17,66 @@ from .civilization_agent import (
 )
 
 
+_OFFSPRING_RULES = """Create the child's role description following these rules:
+1. INHERIT core skills and values from the parent (the parent was successful!)
+2. MUTATE slightly - add small variations or adjacent skills
+3. Follow the mutation rate given with the parent's details
+4. The child may explore slightly different approaches but should build on parent's success"""
+
+# Inheritance instructions shared by every offspring request. Sent as the
+# system message so providers can reuse the cached prefix across calls;
+# only the parent's details go in the user message.
+OFFSPRING_SYSTEM_PROMPT = f"""\
+You are creating a new AI agent that is the offspring of an existing agent.
+
+{_OFFSPRING_RULES}
+
+Output ONLY the new system prompt for the child (max 300 words)."""
+
+# Same instructions for one request covering several parents
+OFFSPRING_BATCH_SYSTEM_PROMPT = f"""\
+You are creating new AI agents, each the offspring of an existing agent.
+
+The user message gives the mutation rate and a JSON array of parents. For EACH parent:
+{_OFFSPRING_RULES}
+
+Respond with a JSON object {{"children": [...]}} containing one new system prompt
+(max 300 words) per parent, in the same order as the parents."""
+
+# Parents per batched request; keeps max_tokens within small models' output limits
+OFFSPRING_BATCH_SIZE = 16
+
+# Per-parent details for the user message, formatted with format_map
+_INHERIT_TMPL = """PARENT'S EXPERTISE AND ROLE:
+{system_prompt}
+
+PARENT'S PERFORMANCE:
+- Age: {age} generations survived
+- Wealth accumulated: {wealth:.1f}
+- Best task type: {best_task}
+
+MUTATION RATE: {mutation_rate:.1%} - {mutation_desc}"""
+
+# Keyed by mutation_rate > 0.5
+_MUT_DESC = {
+    True: "significant changes allowed",
+    False: "keep mostly similar to parent",
+}
+
+# Rewriting a parent prompt is a short template task; a small model is enough
+DEFAULT_OFFSPRING_MODEL = "gpt-4o-mini"
+
+# Recently generated child prompts, keyed by (model, parent prompt, mutation rate, best task)
+OFFSPRING_CACHE_SIZE = 256
+_offspring_prompt_cache: "OrderedDict[Tuple[str, str, float, str], str]" = OrderedDict()
+
+
 async def reproduce(
     parent: CivilizationAgent,
     llm_client,
-    mutation_rate: float = 0.3
+    mutation_rate: float = 0.3,
+    use_cache: bool = False,
+    model: str = DEFAULT_OFFSPRING_MODEL
 ) -> CivilizationAgent:
     """
     Create offspring from a parent agent.
@@ -26,6 +87,8 @@ async def reproduce(
         parent: The parent agent
         llm_client: LLM API client
         mutation_rate: How much to mutate the prompt (0-1)
+        use_cache: Reuse a recent child prompt for an identical parent
+        model: LLM model used to write the child prompt
 
     Returns:
         New CivilizationAgent offspring
@@ -41,9 +104,14 @@ async def reproduce(
 
     # Generate child prompt via inheritance + mutation
     child_prompt = await _generate_offspring_prompt(
-        parent, llm_client, mutation_rate
+        parent, llm_client, mutation_rate, use_cache, model
     )
 
+    return _spawn_offspring(parent, child_prompt)
+
+
+def _spawn_offspring(parent: CivilizationAgent, child_prompt: str) -> CivilizationAgent:
+    """Charge the parent and create a child with the given prompt."""
     # Pay reproduction cost
     parent.pay_reproduction_cost()
 
@@ -56,36 +124,100 @@ async def reproduce(
 async def _generate_offspring_prompt(
     parent: CivilizationAgent,
     llm_client,
-    mutation_rate: float
+    mutation_rate: float,
+    use_cache: bool = False,
+    model: str = DEFAULT_OFFSPRING_MODEL
 ) -> str:
     """Generate a child's prompt via inheritance and mutation."""
+    best_task = parent.get_best_task_type() or 'unknown'
+
+    cache_key = (model, parent.system_prompt, round(mutation_rate, 2), best_task)
+    if use_cache and cache_key in _offspring_prompt_cache:
+        _offspring_prompt_cache.move_to_end(cache_key)
+        return _offspring_prompt_cache[cache_key]
+
+    parent_facts = _INHERIT_TMPL.format_map({
+        "system_prompt": parent.system_prompt,
+        "age": parent.age,
+        "wealth": parent.wealth,
+        "best_task": best_task,
+        "mutation_rate": mutation_rate,
+        "mutation_desc": _MUT_DESC[mutation_rate > 0.5],
+    })
+
+    response = await llm_client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": OFFSPRING_SYSTEM_PROMPT},
+            {"role": "user", "content": parent_facts}
+        ],
+        temperature=0.5 + mutation_rate * 0.5,  # Higher mutation = higher temperature
+        max_tokens=500
+    )
 
-    inheritance_prompt = f"""You are creating a new AI agent that is the offspring of an existing agent.
+    child_prompt = response.choices[0].message.content.strip()
 
-PARENT'S EXPERTISE AND ROLE:
-{parent.system_prompt}
+    if use_cache:
+        _offspring_prompt_cache[cache_key] = child_prompt
+        while len(_offspring_prompt_cache) > OFFSPRING_CACHE_SIZE:
+            _offspring_prompt_cache.popitem(last=False)
 
-PARENT'S PERFORMANCE:
-- Age: {parent.age} generations survived
-- Wealth accumulated: {parent.wealth:.1f}
-- Best task type: {parent.get_best_task_type() or 'unknown'}
+    return child_prompt
 
-Create the child's role description following these rules:
-1. INHERIT core skills and values from the parent (the parent was successful!)
-2. MUTATE slightly - add small variations or adjacent skills
-3. The mutation rate is {mutation_rate:.1%} - {"significant changes allowed" if mutation_rate > 0.5 else "keep mostly similar to parent"}
-4. The child may explore slightly different approaches but should build on parent's success
 
-Output ONLY the new system prompt for the child (max 300 words)."""
+async def _generate_offspring_prompts_batch(
+    parents: List[CivilizationAgent],
+    llm_client,
+    mutation_rate: float,
+    model: str = DEFAULT_OFFSPRING_MODEL
+) -> List[str]:
+    """
+    Generate child prompts for several parents in a single LLM call.
+
+    Raises:
+        ValueError: If the response is not a JSON list of one prompt per parent
+    """
+    parent_facts = [
+        {
+            "role": p.system_prompt,
+            "age": p.age,
+            "wealth": round(p.wealth, 1),
+            "best_task_type": p.get_best_task_type() or 'unknown',
+        }
+        for p in parents
+    ]
+    user_message = (
+        f"MUTATION RATE: {mutation_rate:.1%} - {_MUT_DESC[mutation_rate > 0.5]}\n\n"
+        f"PARENTS:\n{json.dumps(parent_facts, indent=2)}"
+    )
 
     response = await llm_client.chat.completions.create(
-        model="gpt-4",
-        messages=[{"role": "user", "content": inheritance_prompt}],
-        temperature=0.5 + mutation_rate * 0.5,  # Higher mutation = higher temperature
-        max_tokens=500
+        model=model,
+        messages=[
+            {"role": "system", "content": OFFSPRING_BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": user_message}
+        ],
+        temperature=0.5 + mutation_rate * 0.5,
+        max_tokens=500 * len(parents),
+        response_format={"type": "json_object"}
     )
 
-    return response.choices[0].message.content.strip()
+    try:
+        children = json.loads(response.choices[0].message.content)["children"]
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
+        raise ValueError(f"Malformed batch response: {e}")
+
+    if not isinstance(children, list):
+        raise ValueError(f"Expected a list of child prompts, got {children!r}")
+    if len(children) != len(parents) or not all(isinstance(c, str) for c in children):
+        raise ValueError(f"Expected {len(parents)} child prompts, got {len(children)}")
+
+    return [c.strip() for c in children]
+
+
+def clear_offspring_prompt_cache():
+    """Clear cached child prompts (for new simulations)."""
+    _offspring_prompt_cache.clear()
 
 
 def can_reproduce(agent: CivilizationAgent) -> bool:
@@ -102,18 +234,33 @@ async def reproduction_phase(
     agents: List[CivilizationAgent],
     llm_client,
     max_offspring_per_gen: Optional[int] = None,
-    mutation_rate: float = 0.3
+    mutation_rate: float = 0.3,
+    max_concurrent: int = 16,
+    use_cache: bool = False,
+    share_prompts: bool = False,
+    batch_prompts: bool = False,
+    model: str = DEFAULT_OFFSPRING_MODEL
 ) -> List[CivilizationAgent]:
     """
     Run reproduction phase for a generation.
 
-    All agents that can afford it reproduce.
+    All agents that can afford it reproduce. Offspring prompts are
+    generated in parallel, bounded by max_concurrent. With share_prompts,
+    parents with the same prompt and best task type make one LLM call
+    and all their children get the resulting prompt. With batch_prompts,
+    child prompts are requested in batched structured calls, falling back
+    to per-parent calls for any batch that fails.
 
     Args:
         agents: Current population
         llm_client: LLM API client
         max_offspring_per_gen: Optional limit on new agents
         mutation_rate: Prompt mutation rate
+        max_concurrent: Maximum number of in-flight LLM requests
+        use_cache: Reuse recent child prompts for identical parents
+        share_prompts: One LLM call per group of identical parents
+        batch_prompts: One LLM call per OFFSPRING_BATCH_SIZE parents
+        model: LLM model used to write child prompts
 
     Returns:
         List of new offspring agents
@@ -122,15 +269,77 @@ async def reproduction_phase(
 
     if max_offspring_per_gen:
         # Prioritize wealthiest agents
-        reproducible = sorted(reproducible, key=lambda a: -a.wealth)
-        reproducible = reproducible[:max_offspring_per_gen]
+        reproducible = heapq.nlargest(
+            max_offspring_per_gen, reproducible, key=lambda a: a.wealth
+        )
 
     offspring = []
-    for parent in reproducible:
-        try:
-            child = await reproduce(parent, llm_client, mutation_rate)
-            offspring.append(child)
-        except Exception as e:
-            print(f"Reproduction failed for {parent.id}: {e}")
+    sem = asyncio.Semaphore(max_concurrent)
+
+    async def _generate_batch(chunk: List[CivilizationAgent]) -> List[str]:
+        async with sem:
+            return await _generate_offspring_prompts_batch(
+                chunk, llm_client, mutation_rate, model
+            )
+
+    if batch_prompts and len(reproducible) > 1:
+        chunks = [
+            reproducible[i:i + OFFSPRING_BATCH_SIZE]
+            for i in range(0, len(reproducible), OFFSPRING_BATCH_SIZE)
+        ]
+        batches = await asyncio.gather(
+            *[_generate_batch(chunk) for chunk in chunks],
+            return_exceptions=True
+        )
+
+        # Parents whose batch failed go through the per-parent calls below
+        reproducible = []
+        for chunk, child_prompts in zip(chunks, batches):
+            if isinstance(child_prompts, BaseException):
+                print(f"Batched offspring prompts failed, "
+                      f"falling back to per-parent calls: {child_prompts}")
+                reproducible.extend(chunk)
+            else:
+                offspring.extend(
+                    _spawn_offspring(parent, child_prompt)
+                    for parent, child_prompt in zip(chunk, child_prompts)
+                )
+
+        if not reproducible:
+            return offspring
+
+    # (system_prompt, best task, mutation rate) -> shared child prompt task
+    shared_prompts = {}
+
+    async def _generate(parent: CivilizationAgent) -> str:
+        async with sem:
+            return await _generate_offspring_prompt(
+                parent, llm_client, mutation_rate, use_cache, model
+            )
+
+    async def _reproduce(parent: CivilizationAgent) -> CivilizationAgent:
+        if not share_prompts:
+            async with sem:
+                return await reproduce(
+                    parent, llm_client, mutation_rate, use_cache, model
+                )
+
+        key = (parent.system_prompt, parent.get_best_task_type(), round(mutation_rate, 2))
+        if key not in shared_prompts:
+            shared_prompts[key] = asyncio.ensure_future(_generate(parent))
+
+        child_prompt = await shared_prompts[key]
+        return _spawn_offspring(parent, child_prompt)
+
+    results = await asyncio.gather(
+        *[_reproduce(parent) for parent in reproducible],
+        return_exceptions=True
+    )
+
+    for parent, result in zip(reproducible, results):
+        if isinstance(result, BaseException):
+            print(f"Reproduction failed for {parent.id}: {result}")
+        else:
+            offspring.append(result)
 
     return offspring
@@ -0,0 +1,233 @@
+"""
+Semantic cache for templated LLM calls.
+
+Governance prompts are heavily templated: agents with similar wealth,
+age and role receive near-identical vote/proposal prompts. The cache
+embeds each prompt and reuses a previous response when a stored prompt
+is within a cosine-similarity threshold, only calling the LLM on a miss.
+"""
+
+from dataclasses import dataclass
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import asyncio
+import threading
+import time
+import numpy as np
+
+
+@dataclass
+class CacheConfig:
+    """Configuration for SemanticCache."""
+    threshold: float = 0.87  # Minimum cosine similarity for a hit
+    ttl: Optional[float] = None  # Seconds before an entry expires (None = never)
+    max_entries: int = 1024  # LRU capacity per namespace
+    model_name: str = 'all-MiniLM-L6-v2'
+
+
+class SemanticCache:
+    """
+    In-memory embedding cache for LLM chat completions.
+
+    Entries are partitioned by namespace (e.g. "propose", or "vote:<rule id>") so that
+    different prompt families never answer each other. Falls back to
+    exact prompt matching if sentence-transformers is not installed.
+    """
+
+    def __init__(self, config: Optional[CacheConfig] = None):
+        self.config = config or CacheConfig()
+        self.hits = 0
+        self.misses = 0
+
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._use_embeddings = True
+        # namespace -> OrderedDict[prompt -> (embedding, response, created_at)]
+        self._entries: Dict[str, OrderedDict] = {}
+        # namespace -> (prompts, normalized embedding matrix), rebuilt lazily
+        self._matrices: Dict[str, Tuple[list, np.ndarray]] = {}
+        # namespace -> {task: (prompt, embedding)} for LLM calls still in flight
+        self._inflight: Dict[str, Dict[asyncio.Future, Tuple[str, Optional[np.ndarray]]]] = {}
+
+    def _embed(self, prompt: str) -> Optional[np.ndarray]:
+        """Embed a prompt as a unit vector, or None if embeddings are unavailable."""
+        if not self._use_embeddings:
+            return None
+
+        if self._model is None:
+            # complete() embeds in worker threads; load the model only once
+            with self._model_lock:
+                if not self._use_embeddings:
+                    return None
+                if self._model is None:
+                    try:
+                        from sentence_transformers import SentenceTransformer
+                    except ImportError:
+                        print("Warning: sentence-transformers not installed, "
+                              "semantic cache falls back to exact matching")
+                        self._use_embeddings = False
+                        return None
+                    self._model = SentenceTransformer(self.config.model_name)
+
+        embedding = np.asarray(self._model.encode(prompt), dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding
+
+    async def _embed_async(self, prompt: str) -> Optional[np.ndarray]:
+        """Embed a prompt in a worker thread so the event loop keeps running."""
+        if not self._use_embeddings:
+            return None
+        return await asyncio.to_thread(self._embed, prompt)
+
+    def _expire(self, namespace: str) -> None:
+        """Drop entries older than the configured TTL."""
+        if self.config.ttl is None:
+            return
+
+        entries = self._entries.get(namespace)
+        if not entries:
+            return
+
+        cutoff = time.monotonic() - self.config.ttl
+        expired = [p for p, (_, _, created) in entries.items() if created < cutoff]
+        for prompt in expired:
+            del entries[prompt]
+        if expired:
+            self._matrices.pop(namespace, None)
+
+    def lookup(self, prompt: str, namespace: str = "default",
+               embedding: Optional[np.ndarray] = None) -> Optional[str]:
+        """Return a cached response for a similar prompt, or None on miss."""
+        self._expire(namespace)
+        entries = self._entries.get(namespace)
+        if not entries:
+            return None
+
+        # Exact match needs no embedding
+        if prompt in entries:
+            entries.move_to_end(prompt)
+            return entries[prompt][1]
+
+        if embedding is None:
+            embedding = self._embed(prompt)
+        if embedding is None:
+            return None
+
+        if namespace not in self._matrices:
+            prompts = list(entries.keys())
+            matrix = np.vstack([entries[p][0] for p in prompts])
+            self._matrices[namespace] = (prompts, matrix)
+
+        prompts, matrix = self._matrices[namespace]
+        sims = matrix @ embedding
+        best = int(np.argmax(sims))
+
+        if sims[best] < self.config.threshold:
+            return None
+
+        key = prompts[best]
+        entries.move_to_end(key)
+        return entries[key][1]
+
+    def insert(self, prompt: str, response: str, namespace: str = "default",
+               embedding: Optional[np.ndarray] = None) -> None:
+        """Store a response, evicting the least recently used entry if full."""
+        if embedding is None:
+            embedding = self._embed(prompt)
+        if embedding is None:
+            # Exact-match mode: a zero vector never clears the threshold
+            embedding = np.zeros(1, dtype=np.float32)
+
+        entries = self._entries.setdefault(namespace, OrderedDict())
+        entries[prompt] = (embedding, response, time.monotonic())
+        entries.move_to_end(prompt)
+
+        while len(entries) > self.config.max_entries:
+            entries.popitem(last=False)
+
+        self._matrices.pop(namespace, None)
+
+    def _find_inflight(self, prompt: str, namespace: str,
+                       embedding: Optional[np.ndarray]) -> Optional[asyncio.Future]:
+        """Return an in-flight call for the same or a similar prompt, if any."""
+        for task, (other, other_embedding) in self._inflight.get(namespace, {}).items():
+            if other == prompt:
+                return task
+            if (embedding is not None and other_embedding is not None
+                    and float(other_embedding @ embedding) >= self.config.threshold):
+                return task
+        return None
+
+    async def _fetch(self, llm_client, prompt: str, namespace: str,
+                     embedding: Optional[np.ndarray], kwargs: dict) -> str:
+        """Call the LLM and cache the response."""
+        response = await llm_client.chat.completions.create(
+            messages=[{"role": "user", "content": prompt}],
+            **kwargs
+        )
+        content = response.choices[0].message.content
+
+        self.insert(prompt, content, namespace, embedding)
+        return content
+
+    async def complete(self, llm_client, prompt: str,
+                       namespace: str = "default", **kwargs) -> str:
+        """
+        Get a chat completion for a single user prompt, using the cache.
+
+        Concurrent calls with the same or a similar prompt share a single
+        LLM request: later callers wait for the first one's response.
+
+        Args:
+            llm_client: LLM API client
+            prompt: The user message
+            namespace: Cache partition for this prompt family
+            **kwargs: Passed through to chat.completions.create
+
+        Returns:
+            The response text (cached or fresh)
+        """
+        embedding = await self._embed_async(prompt)
+        cached = self.lookup(prompt, namespace, embedding)
+
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        pending = self._find_inflight(prompt, namespace, embedding)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        task = asyncio.ensure_future(
+            self._fetch(llm_client, prompt, namespace, embedding, kwargs)
+        )
+        inflight = self._inflight.setdefault(namespace, {})
+        inflight[task] = (prompt, embedding)
+        task.add_done_callback(inflight.pop)
+
+        # Shielded so a cancelled caller does not cancel the shared request
+        return await asyncio.shield(task)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """Get cache hit/miss counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "entries": sum(len(e) for e in self._entries.values()),
+        }
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        self._entries.clear()
+        self._matrices.clear()
+        self.hits = 0
+        self.misses = 0
@@ -8,15 +8,173 @@ Key metrics:
 - Social mobility
 """
 
-from typing import List, Dict, Any
+from dataclasses import dataclass
+from typing import List, Dict, Any, Union, NamedTuple, Optional, Tuple
 from collections import Counter
+import math
 import numpy as np
 
-from .civilization_agent import CivilizationAgent
+from .agent import DATACLASS_SLOTS
+from .civilization_agent import CivilizationAgent, PopulationArrays
 from .governance import Rule, RuleCategory
+from .jit import njit, HAS_NUMBA
 
 
-def compute_gini(agents: List[CivilizationAgent]) -> float:
+# Rule category -> bincount index, and max entropy for normalization
+_N_CATEGORIES = len(RuleCategory)
+_LOG_N_CATEGORIES = math.log(_N_CATEGORIES)
+_CAT_IDX = {c: i for i, c in enumerate(RuleCategory)}
+
+
+class _WealthView(NamedTuple):
+    """
+    Population sorted once by wealth, richest first.
+
+    Built once in compute_all_society_metrics and passed to each metric so
+    none of them re-reads agent wealth or re-sorts. agents is None when
+    the view was built from a bare wealth array.
+    """
+    agents: Optional[List[CivilizationAgent]]
+    wealth_desc: np.ndarray
+
+
+class MobilityStats(NamedTuple):
+    """Fractions of continuing agents whose wealth rank moved."""
+    upward: float
+    downward: float
+    stable: float
+    total_continuing: int
+
+
+_NO_MOBILITY = MobilityStats(0.0, 0.0, 0.0, 0)
+
+
+@dataclass(**DATACLASS_SLOTS)
+class SocietyMetrics:
+    """All society metrics for one generation."""
+    population: int
+    total_wealth: float
+    mean_wealth: float
+    gini: float
+    wealth_concentration_top3: float
+    wealth_concentration_top10pct: float
+    specialization_by_class: Dict[str, Dict[str, float]]
+
+    # Only set when rules / previous wealths were given
+    governance_entropy: Optional[float] = None
+    n_passed_rules: Optional[int] = None
+    rules_by_category: Optional[Dict[str, int]] = None
+    social_mobility: Optional[MobilityStats] = None
+
+    def asdict(self) -> Dict[str, Any]:
+        """Plain dict for serialization; unset optional metrics are omitted."""
+        result = {
+            "population": self.population,
+            "total_wealth": self.total_wealth,
+            "mean_wealth": self.mean_wealth,
+            "gini": self.gini,
+            "wealth_concentration_top3": self.wealth_concentration_top3,
+            "wealth_concentration_top10pct": self.wealth_concentration_top10pct,
+            "specialization_by_class": self.specialization_by_class,
+        }
+
+        if self.governance_entropy is not None:
+            result["governance_entropy"] = self.governance_entropy
+            result["n_passed_rules"] = self.n_passed_rules
+            result["rules_by_category"] = self.rules_by_category
+
+        if self.social_mobility is not None:
+            result["social_mobility"] = self.social_mobility._asdict()
+
+        return result
+
+
+# Anything the wealth metrics can read wealth from
+WealthSource = Union[List[CivilizationAgent], PopulationArrays, np.ndarray, _WealthView]
+
+
+def _wealth_array(agents: WealthSource) -> np.ndarray:
+    """Get an (unsorted) float64 wealth array from any wealth source."""
+    if isinstance(agents, _WealthView):
+        return agents.wealth_desc
+    if isinstance(agents, np.ndarray):
+        return np.asarray(agents, dtype=np.float64)
+    if isinstance(agents, PopulationArrays):
+        return agents.wealth
+    return np.fromiter((a.wealth for a in agents), dtype=np.float64, count=len(agents))
+
+
+def _wealth_view(agents: WealthSource) -> _WealthView:
+    """Get a _WealthView for agents, their arrays view, or a wealth array."""
+    if isinstance(agents, _WealthView):
+        return agents
+
+    wealths = _wealth_array(agents)
+
+    if isinstance(agents, np.ndarray):
+        return _WealthView(None, np.sort(wealths)[::-1])
+
+    agent_list = agents.agents if isinstance(agents, PopulationArrays) else agents
+
+    # Stable, so equal-wealth agents keep population order
+    order = np.argsort(-wealths, kind='stable')
+    sorted_agents = [agent_list[i] for i in order.tolist()]
+
+    return _WealthView(sorted_agents, wealths[order])
+
+
+# Numeric kernels. Explicit signatures compile at import, so the first
+# call pays no JIT latency; all take plain arrays, never agent objects.
+
+@njit("float64(float64[:])", cache=True, fastmath=True)
+def _gini_kernel(wealths_asc):
+    """Gini = (2 * sum(i * x_i)) / (n * sum(x_i)) - (n + 1) / n, x sorted ascending."""
+    w = wealths_asc
+    n = w.size
+
+    # Single pass: running sum and rank-weighted sum together
+    total = 0.0
+    acc = 0.0
+    for i in range(n):
+        total += w[i]
+        acc += (i + 1) * w[i]
+
+    if total == 0:
+        return 0.0
+
+    return 2.0 * acc / (n * total) - (n + 1) / n
+
+
+def _gini_numpy(wealths_asc: np.ndarray) -> float:
+    """Vectorized Gini for when numba is unavailable (same formula as _gini_kernel)."""
+    n = wealths_asc.size
+    total = wealths_asc.sum()
+
+    if total == 0:
+        return 0.0
+
+    ranks = np.arange(1, n + 1, dtype=np.float64)
+    return 2.0 * np.dot(ranks, wealths_asc) / (n * total) - (n + 1) / n
+
+
+@njit("float64(int64[:])", cache=True, fastmath=True)
+def _entropy_kernel(counts):
+    """Shannon entropy (nats) of a histogram; zero bins are skipped."""
+    total = counts.sum()
+
+    if total == 0:
+        return 0.0
+
+    entropy = 0.0
+    for i in range(counts.size):
+        if counts[i] > 0:
+            p = counts[i] / total
+            entropy -= p * np.log(p)
+
+    return entropy
+
+
+def compute_gini(agents: WealthSource) -> float:
     """
     Compute Gini coefficient for wealth inequality.
 
@@ -24,33 +182,23 @@ def compute_gini(agents: List[CivilizationAgent]) -> float:
     Gini = 1: Maximum inequality (one agent has all wealth)
 
     Args:
-        agents: List of agents
+        agents: List of agents, their PopulationArrays view, or a wealth array
 
     Returns:
         float: Gini coefficient between 0 and 1
     """
-    if not agents:
-        return 0.0
-
-    wealths = sorted([a.wealth for a in agents])
-    n = len(wealths)
-
-    if n == 1:
-        return 0.0
+    if isinstance(agents, _WealthView):
+        wealth_asc = agents.wealth_desc[::-1]
+    else:
+        wealth_asc = np.sort(_wealth_array(agents))
 
-    # Gini formula using cumulative sums
-    cumsum = np.cumsum(wealths)
-
-    # Gini = (2 * sum(i * x_i)) / (n * sum(x_i)) - (n + 1) / n
-    numerator = 2 * sum((i + 1) * x for i, x in enumerate(wealths))
-    denominator = n * sum(wealths)
-
-    if denominator == 0:
+    if wealth_asc.size < 2:
         return 0.0
 
-    gini = numerator / denominator - (n + 1) / n
+    # The kernel loops element by element, which is only fast when compiled
+    gini = _gini_kernel(wealth_asc) if HAS_NUMBA else _gini_numpy(wealth_asc)
 
-    return float(max(0, min(1, gini)))
+    return float(np.clip(gini, 0.0, 1.0))
 
 
 def compute_governance_entropy(rules: List[Rule]) -> float:
@@ -66,115 +214,131 @@ def compute_governance_entropy(rules: List[Rule]) -> float:
     Returns:
         float: Entropy value (normalized to 0-1)
     """
-    passed_rules = [r for r in rules if r.passed]
+    ids = np.fromiter(
+        (_CAT_IDX[r.category] for r in rules if r.passed),
+        dtype=np.int32
+    )
 
-    if not passed_rules:
+    if ids.size == 0:
         return 0.0
 
     # Count categories
-    categories = [r.category.value for r in passed_rules]
-    counts = Counter(categories)
+    counts = np.bincount(ids, minlength=_N_CATEGORIES)
 
-    # Compute entropy
-    total = sum(counts.values())
-    probs = [c / total for c in counts.values()]
+    return _entropy_from_counts(counts)
 
-    entropy = -sum(p * np.log(p + 1e-10) for p in probs)
+
+def _entropy_from_counts(counts: np.ndarray) -> float:
+    """Category entropy from per-category counts, normalized to 0-1."""
+    entropy = _entropy_kernel(counts.astype(np.int64, copy=False))
 
     # Normalize by max possible entropy
-    max_entropy = np.log(len(RuleCategory))
+    return float(entropy / _LOG_N_CATEGORIES)
+
 
-    return float(entropy / max_entropy)
+def _summarize_rules(rules: List[Rule]) -> Tuple[int, Counter]:
+    """Count passed rules and their categories in a single pass."""
+    n_passed = 0
+    by_category = Counter()
+    for r in rules:
+        if r.passed:
+            n_passed += 1
+            by_category[r.category.value] += 1
 
+    return n_passed, by_category
 
-def compute_wealth_concentration(agents: List[CivilizationAgent],
-                                  top_n: int = 3) -> float:
+
+def compute_wealth_concentration(agents: WealthSource,
+                                  top_n: int = 3,
+                                  total: Optional[float] = None) -> float:
     """
     Compute fraction of wealth held by top N agents.
 
     Args:
-        agents: List of agents
+        agents: List of agents, their PopulationArrays view, or a wealth array
         top_n: Number of top agents to consider
+        total: Total wealth, if already known
 
     Returns:
         float: Fraction of total wealth held by top N
     """
-    if not agents:
+    wealths = _wealth_array(agents)
+
+    if wealths.size == 0:
         return 0.0
 
-    wealths = sorted([a.wealth for a in agents], reverse=True)
-    total = sum(wealths)
+    if isinstance(agents, _WealthView):
+        top = wealths[:top_n]
+    else:
+        # Linear-time selection of the top N instead of a full sort
+        k = min(top_n, wealths.size)
+        top = np.partition(wealths, -k)[-k:] if k > 0 else wealths[:0]
+
+    if total is None:
+        total = wealths.sum()
 
     if total == 0:
         return 0.0
 
-    top_wealth = sum(wealths[:top_n])
-
-    return top_wealth / total
+    return float(top.sum() / total)
 
 
 def compute_social_mobility(
-    agents: List[CivilizationAgent],
+    agents: Union[List[CivilizationAgent], _WealthView],
     previous_wealths: Dict[str, float]
-) -> Dict[str, float]:
+) -> MobilityStats:
     """
     Compute social mobility metrics.
 
     Measures how much agents' wealth rankings have changed.
 
     Args:
-        agents: Current agents
+        agents: Current agents (or a _WealthView of them)
         previous_wealths: Previous generation's wealth by agent_id
 
     Returns:
-        Dict with mobility metrics
+        MobilityStats with upward/downward/stable fractions
     """
-    if not agents or not previous_wealths:
-        return {"upward": 0, "downward": 0, "stable": 0}
-
-    # Get agents that existed in both periods
-    continuing = [a for a in agents if a.id in previous_wealths]
+    if not previous_wealths:
+        return _NO_MOBILITY
 
-    if not continuing:
-        return {"upward": 0, "downward": 0, "stable": 0}
+    view = _wealth_view(agents)
 
-    # Previous ranks
-    prev_sorted = sorted(previous_wealths.items(), key=lambda x: -x[1])
-    prev_ranks = {aid: i for i, (aid, _) in enumerate(prev_sorted)}
+    # Get agents that existed in both periods (already richest first)
+    continuing = [a for a in view.agents if a.id in previous_wealths]
 
-    # Current ranks
-    curr_sorted = sorted(continuing, key=lambda a: -a.wealth)
-    curr_ranks = {a.id: i for i, a in enumerate(curr_sorted)}
+    if not continuing:
+        return _NO_MOBILITY
 
-    # Count mobility
-    upward = 0
-    downward = 0
-    stable = 0
+    total = len(continuing)
 
-    for agent in continuing:
-        prev_rank = prev_ranks.get(agent.id, len(prev_ranks))
-        curr_rank = curr_ranks.get(agent.id, len(curr_ranks))
+    # Previous ranks (stable, so ties keep insertion order)
+    prev_wealth = np.fromiter(
+        previous_wealths.values(), dtype=np.float64, count=len(previous_wealths)
+    )
+    prev_rank = np.empty(prev_wealth.size, dtype=np.int64)
+    prev_rank[np.argsort(-prev_wealth, kind='stable')] = np.arange(prev_wealth.size)
+    prev_ranks = dict(zip(previous_wealths.keys(), prev_rank.tolist()))
 
-        if curr_rank < prev_rank - 1:  # Improved by more than 1 position
-            upward += 1
-        elif curr_rank > prev_rank + 1:  # Worsened by more than 1 position
-            downward += 1
-        else:
-            stable += 1
+    # Current ranks: continuing is already sorted richest first
+    curr_rank = np.arange(total)
+    prev_rank = np.fromiter(
+        (prev_ranks[a.id] for a in continuing), dtype=np.int64, count=total
+    )
 
-    total = len(continuing)
+    # Count mobility (moving more than 1 position up or down)
+    diff = curr_rank - prev_rank
+    upward = int(np.count_nonzero(diff < -1))
+    downward = int(np.count_nonzero(diff > 1))
+    stable = diff.size - upward - downward
 
-    return {
-        "upward": upward / total,
-        "downward": downward / total,
-        "stable": stable / total,
-        "total_continuing": total
-    }
+    return MobilityStats(upward / total, downward / total, stable / total, total)
 
 
 def compute_specialization_by_class(
-    agents: List[CivilizationAgent],
-    n_classes: int = 3
+    agents: Union[List[CivilizationAgent], _WealthView],
+    n_classes: int = 3,
+    best_tasks: Optional[List[str]] = None
 ) -> Dict[str, Dict[str, float]]:
     """
     Analyze specialization patterns by wealth class.
@@ -183,17 +347,22 @@ def compute_specialization_by_class(
     specialization patterns in each class.
 
     Args:
-        agents: List of agents
+        agents: List of agents (or a _WealthView of them)
         n_classes: Number of wealth classes
+        best_tasks: Precomputed best task type per agent, richest first
 
     Returns:
         Dict mapping class to specialization distribution
     """
-    if not agents:
+    # Sort by wealth and divide into classes
+    sorted_agents = _wealth_view(agents).agents
+
+    if not sorted_agents:
         return {}
 
-    # Sort by wealth and divide into classes
-    sorted_agents = sorted(agents, key=lambda a: -a.wealth)
+    if best_tasks is None:
+        best_tasks = [a.get_best_task_type() or "generalist" for a in sorted_agents]
+
     class_size = len(sorted_agents) // n_classes
 
     result = {}
@@ -202,10 +371,9 @@ def compute_specialization_by_class(
     for i, class_name in enumerate(class_names):
         start = i * class_size
         end = (i + 1) * class_size if i < n_classes - 1 else len(sorted_agents)
-        class_agents = sorted_agents[start:end]
 
         # Count specializations
-        specs = [a.get_best_task_type() or "generalist" for a in class_agents]
+        specs = best_tasks[start:end]
         counts = Counter(specs)
         total = len(specs)
 
@@ -220,34 +388,41 @@ def compute_all_society_metrics(
     agents: List[CivilizationAgent],
     rules: List[Rule] = None,
     previous_wealths: Dict[str, float] = None
-) -> Dict[str, Any]:
+) -> SocietyMetrics:
     """
     Compute all society metrics.
 
-    Returns comprehensive metrics dictionary.
+    Returns SocietyMetrics; call .asdict() for a plain dictionary.
     """
-    gini = compute_gini(agents)
-
-    metrics = {
-        "population": len(agents),
-        "total_wealth": sum(a.wealth for a in agents),
-        "mean_wealth": np.mean([a.wealth for a in agents]) if agents else 0,
-        "gini": gini,
-        "wealth_concentration_top3": compute_wealth_concentration(agents, 3),
-        "wealth_concentration_top10pct": compute_wealth_concentration(
-            agents, max(1, len(agents) // 10)
+    # Read and sort wealth once and share it across all agent metrics
+    view = _wealth_view(agents)
+    gini = compute_gini(view)
+    total_wealth = float(view.wealth_desc.sum())
+    best_tasks = [a.get_best_task_type() or "generalist" for a in view.agents]
+
+    metrics = SocietyMetrics(
+        population=len(agents),
+        total_wealth=total_wealth,
+        mean_wealth=total_wealth / len(agents) if agents else 0,
+        gini=gini,
+        wealth_concentration_top3=compute_wealth_concentration(view, 3, total_wealth),
+        wealth_concentration_top10pct=compute_wealth_concentration(
+            view, max(1, len(agents) // 10), total_wealth
+        ),
+        specialization_by_class=compute_specialization_by_class(
+            view, best_tasks=best_tasks
         ),
-        "specialization_by_class": compute_specialization_by_class(agents),
-    }
+    )
 
     if rules:
-        metrics["governance_entropy"] = compute_governance_entropy(rules)
-        metrics["n_passed_rules"] = len([r for r in rules if r.passed])
-        metrics["rules_by_category"] = dict(Counter(
-            r.category.value for r in rules if r.passed
-        ))
+        n_passed, by_category = _summarize_rules(rules)
+        metrics.governance_entropy = _entropy_from_counts(
+            np.fromiter(by_category.values(), dtype=np.int64, count=len(by_category))
+        )
+        metrics.n_passed_rules = n_passed
+        metrics.rules_by_category = dict(by_category)
 
     if previous_wealths:
-        metrics["social_mobility"] = compute_social_mobility(agents, previous_wealths)
+        metrics.social_mobility = compute_social_mobility(view, previous_wealths)
 
     return metrics